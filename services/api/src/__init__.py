@@ -1 +1,6 @@
-from .main import app as fastapi_app
\ No newline at end of file
+def __getattr__(name):
+    # Imported on first access: importing a submodule, as README worker processes do, must not build the app
+    if name == "fastapi_app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
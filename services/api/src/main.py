@@ -1,13 +1,25 @@
-from fastapi import FastAPI, HTTPException, Query
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+from fastapi import FastAPI, HTTPException, Query, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from slowapi.middleware import SlowAPIMiddleware
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import os
-import uvicorn
+from urllib.parse import urlparse
 from dotenv import load_dotenv
-from .modules.gitingest import generate_gitingest_txt
+from .modules.gitingest import (
+    iter_gitingest, get_download_name, get_ingest_key, IngestStore,
+    parse_range, negotiate_encoding, compress_stream, iter_file_range
+)
 from .modules.repository_search import RepositorySearch
+from .modules.graph_session import GraphSession, GraphSessionStore
+from .modules.shared_cache import SharedCache, CACHE_DB_PATH
+from .modules.admission import create_limiter, LoadSheddingMiddleware
 
 # Load environment variables
 load_dotenv()
@@ -58,36 +70,11 @@ class PromptSearchRequest(BaseModel):
     max_results: Optional[int] = 500
     limit_results: Optional[int] = 10
 
-# Add this function to your main.py (after the imports)
-def generate_graph_relations(repos):
-    """Generate graph nodes and links for visualization"""
-    all_topics = set()
-    for repo in repos:
-        all_topics |= set(repo['topics'])
-
-    # Assign topic IDs
-    topic_list = list(all_topics)
-    topic_id_map = {topic: i for i, topic in enumerate(topic_list)}
-
-    nodes = []
-    # Topic nodes
-    for i, topic in enumerate(topic_list):
-        nodes.append({"id": i, "name": topic, "type": "topic"})
-
-    # Repo nodes
-    for i, repo in enumerate(repos):
-        repo_id = i + len(topic_list)
-        nodes.append({"id": repo_id, "name": repo['name'], "type": "repo"})
-
-    # Links
-    links = []
-    for i, repo in enumerate(repos):
-        repo_id = i + len(topic_list)
-        for topic in repo['topics']:
-            topic_id = topic_id_map[topic]
-            links.append({"source": repo_id, "target": topic_id})
-
-    return nodes, links
+class GraphExpandRequest(BaseModel):
+    session_id: str
+    node_id: int
+    max_results: Optional[int] = 100
+    limit_results: Optional[int] = 10
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -96,6 +83,14 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Share caches, graph sessions and rate limit counters between workers (WEB_CONCURRENCY > 1) through SQLite
+shared_cache = SharedCache() if os.getenv("SHARED_CACHE", "true").lower() != "false" else None
+
+# Per-client quotas, and a fast 429 when this worker is already saturated (added before CORS so 429s still carry CORS headers)
+app.state.limiter = create_limiter(f"sqlite:///{CACHE_DB_PATH}" if shared_cache else "memory://")
+app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -105,13 +100,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-repository_search = RepositorySearch()
+# Cheap to build: no network and no heavy imports until warm_up() or the first request
+repository_search = RepositorySearch(cache=shared_cache)
+graph_sessions = GraphSessionStore(cache=shared_cache)
+ingest_store = IngestStore()
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
+def warm_up():
+    """Pre-open upstream connection pools and load lazy modules"""
+    started = time.perf_counter()
+    repository_search.warm_up()
+    print(f"🔥 Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms")
 
 @app.on_event("startup")
 async def startup_event():
-    """Log environment variables on startup"""
+    """Log environment variables on startup and warm up in the background"""
     port = os.getenv("PORT", "8000")
     print(f"🚀 Server starting on port: {port}")
+    print(f"⏱️ App imported in {_IMPORT_MS:.0f} ms")
+
+    # Run in a thread so /health answers while upstream connections are being opened
+    if os.getenv("WARMUP", "true").lower() != "false":
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the README processing workers"""
+    repository_search.readme_processor.shutdown()
 
 @app.get("/", response_model=dict)
 async def root():
@@ -121,15 +137,17 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
         "features": [
-            "Git repository text generation with gitingest",
+            "Git repository text generation with gitingest, streamed with range and compression support",
             "Repository search and similarity analysis",
             "AI-powered repository discovery from prompts",
+            "Incremental graph expansion from topic and repo nodes",
             "Health check endpoint",
             "Frontend integration"
         ]
     }
 
 @app.get("/health", response_model=HealthResponse)
+@app.state.limiter.exempt
 async def health_check():
     """Health check endpoint"""
     return HealthResponse(
@@ -142,7 +160,9 @@ async def health_check():
 async def search_repositories_by_prompt(request: PromptSearchRequest):
     """Search repositories based on a user prompt using AI extraction"""
     try:
-        result = repository_search.search_by_prompt(
+        # Blocking GitHub and OpenAI calls run in the threadpool so the worker keeps accepting requests
+        result = await run_in_threadpool(
+            repository_search.search_by_prompt,
             user_prompt=request.prompt,
             max_results=request.max_results,
             limit_results=request.limit_results
@@ -155,25 +175,153 @@ async def search_repositories_by_prompt(request: PromptSearchRequest):
         
         # Generate graph data from the repositories
         repos = result['repositories']
-        nodes, links = generate_graph_relations(repos)
+        session = graph_sessions.create(repos)
         
         return {
             "status": "success",
             "message": f"Found {len(repos)} repositories based on prompt",
             "data": {
                 **result,
+                "graph": session.graph()
+            }
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search repositories by prompt: {str(e)}")
+
+@app.post("/graph/expand", response_model=Dict[str, Any])
+async def expand_graph(request: GraphExpandRequest):
+    """Expand a topic or repo node of a cached graph, returning only the new nodes and links"""
+    session = graph_sessions.get(request.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Graph session not found or expired: {request.session_id}")
+
+    node = session.get_node(request.node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Node not found in graph: {request.node_id}")
+
+    # Everything added from here on is returned, including what concurrent expansions add
+    since = session.size()
+
+    try:
+        # Expanding the same node twice would only refetch what the client already has
+        if request.node_id in session.expanded:
+            repos = []
+        elif node["type"] == "topic":
+            repos = await run_in_threadpool(repository_search.get_topic_repositories, node["name"], request.max_results, request.limit_results)
+        else:
+            repos = await run_in_threadpool(repository_search.get_repo_neighbours, node["name"], request.max_results, request.limit_results)
+
+        # Same repository shape as /repositories/search-by-prompt
+        repos = await run_in_threadpool(repository_search.add_readmes, repos)
+
+        # Merged into the latest version of the session, other workers may have expanded it meanwhile
+        def merge(latest: GraphSession) -> Dict[str, Any]:
+            latest.add_repositories(repos)
+            latest.expanded.add(request.node_id)
+            return latest.changes_since(since)
+
+        delta = await run_in_threadpool(graph_sessions.update, request.session_id, merge)
+        if delta is None:
+            raise HTTPException(status_code=404, detail=f"Graph session not found or expired: {request.session_id}")
+        fetched = {repo["name"].lower(): repo for repo in repos}
+
+        return {
+            "status": "success",
+            "message": f"Added {len(delta['nodes'])} nodes and {len(delta['links'])} links",
+            "data": {
+                "session_id": session.session_id,
+                "expanded_node": node,
+                # Repositories added meanwhile by other expansions only have their search metadata
+                "repositories": [fetched.get(repo["name"].lower(), repo) for repo in delta["repositories"]],
                 "graph": {
-                    "nodes": nodes,
-                    "links": links
+                    "nodes": delta["nodes"],
+                    "links": delta["links"]
                 }
             }
         }
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to search repositories by prompt: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to expand graph node: {str(e)}")
+
+@app.get("/gitingest/download")
+async def download_gitingest(
+    request: Request,
+    repository_url: str,
+    include: Optional[List[str]] = Query(None),
+    exclude: Optional[List[str]] = Query(None),
+    include_gitignored: bool = False,
+    branch: Optional[str] = None,
+    filename: Optional[str] = None,
+    token: Optional[str] = Header(None, alias="X-GitHub-Token")
+):
+    """Stream a gitingest dump while it is generated, with gzip/zstd and Range support once it is complete"""
+    # gitingest also accepts local paths, which must never be reachable from the API
+    if urlparse(repository_url).scheme not in ("http", "https"):
+        raise HTTPException(status_code=400, detail="repository_url must be an http(s) URL")
+
+    key = get_ingest_key(repository_url, token, include, exclude, include_gitignored, branch)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{get_download_name(repository_url, filename)}"',
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+    }
+    media_type = "text/plain; charset=utf-8"
+
+    path = ingest_store.complete_path(key)
+    if path:
+        size = os.path.getsize(path)
+        etag = f'"{key}"'
+        headers["ETag"] = etag
+
+        range_header = request.headers.get("range")
+        byte_range = None
+        if range_header and request.headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                # Malformed or multiple ranges are ignored, the full file is sent with a 200
+                pass
+            else:
+                if byte_range is None:
+                    return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+        if byte_range:
+            # Ranges are served uncompressed, they refer to offsets in the plain text
+            start, end = byte_range
+            return StreamingResponse(
+                iter_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)}
+            )
+        chunks = iter_file_range(path, 0, size - 1)
+    else:
+        # Still being generated: Range is ignored and the whole dump is streamed as it is written
+        generation = ingest_store.get_running(key) or ingest_store.start(
+            key, iter_gitingest(repository_url, token, include, exclude, include_gitignored, branch)
+        )
+        await generation.wait_for_data()
+        if generation.error:
+            raise HTTPException(status_code=400, detail=f"Failed to generate gitingest: {str(generation.error)}")
+        chunks = generation.tail()
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        # Each encoding is a different representation, caches must not mix them up
+        if path:
+            headers["ETag"] = f'"{key}-{encoding}"'
+    elif path:
+        headers["Content-Length"] = str(size)
+
+    return StreamingResponse(compress_stream(chunks, encoding), media_type=media_type, headers=headers)
 
 if __name__ == "__main__":
+    import uvicorn
+
     port = int(os.getenv("PORT", 8000))
     
     uvicorn.run(
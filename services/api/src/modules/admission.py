@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Tuple
+
+from fastapi.responses import JSONResponse
+from limits.storage import Storage
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from .shared_cache import CACHE_DB_PATH, PURGE_INTERVAL, connect
+
+# Per-client quota applied to every route that is not exempt
+RATE_LIMIT = os.getenv("RATE_LIMIT", "30/minute")
+
+# Requests handled at once by one worker before new ones are shed with a 429
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "32"))
+
+# Paths that are never rate limited or shed
+EXEMPT_PATHS = ("/health",)
+
+# Rate limits are checked on the event loop, so a check waits this long at most for another worker's
+# write; the request is let through uncounted when it times out rather than stalling the worker
+RATE_LIMIT_LOCK_TIMEOUT = 0.05
+
+
+class SQLiteStorage(Storage):
+    """limits storage backed by SQLite so every worker on the host shares the same counters
+
+    Used with the fixed window strategy, e.g. storage_uri="sqlite:////tmp/cache.sqlite3".
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str = f"sqlite:///{CACHE_DB_PATH}", wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len("sqlite:///"):]
+        self._local = threading.local()
+        self._increments = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """One connection per thread, like SharedCache, the table is created on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path, timeout=RATE_LIMIT_LOCK_TIMEOUT)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY,"
+                " count INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        # One statement, so the write lock is held as briefly as possible; an expired window restarts
+        try:
+            count = self.conn.execute(
+                "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                " count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,"
+                " expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END"
+                " RETURNING count",
+                (key, amount, now + expiry, now, now)
+            ).fetchone()[0]
+        except sqlite3.OperationalError as e:
+            # Busy for longer than RATE_LIMIT_LOCK_TIMEOUT: let the request through uncounted
+            print(f"Warning: rate limit not counted: {e}")
+            return 0
+
+        # Windows of clients that stopped sending requests are never incremented again
+        self._increments += 1
+        if self._increments % PURGE_INTERVAL == 0:
+            self.purge_expired()
+        return count
+
+    def purge_expired(self) -> int:
+        """Remove expired windows, returning how many were removed"""
+        return self.conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _row(self, key: str) -> Tuple[int, float]:
+        row = self.conn.execute(
+            "SELECT count, expires_at FROM rate_limits WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return row if row else (0, time.time())
+
+    def get(self, key: str) -> int:
+        return self._row(key)[0]
+
+    def get_expiry(self, key: str) -> float:
+        return self._row(key)[1]
+
+    def check(self) -> bool:
+        try:
+            self.conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        return self.conn.execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self.conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+def create_limiter(storage_uri: str = f"sqlite:///{CACHE_DB_PATH}") -> Limiter:
+    """Per-client rate limiter whose counters are shared by all workers"""
+    return Limiter(
+        key_func=get_remote_address,
+        default_limits=[RATE_LIMIT],
+        storage_uri=storage_uri,
+        strategy="fixed-window",
+        headers_enabled=True,
+    )
+
+
+class LoadSheddingMiddleware:
+    """Reject requests with a fast 429 once a worker has too many in flight, instead of queueing them"""
+
+    def __init__(self, app, max_in_flight: int = MAX_IN_FLIGHT):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+
+        if self.in_flight >= self.max_in_flight:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+            return await response(scope, receive, send)
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -1,39 +1,320 @@
 import tempfile
-from typing import Optional, Tuple
-from gitingest import ingest_async
+import asyncio
+import hashlib
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple, List, Dict, AsyncIterator
 import os
+import shutil
 
-async def generate_gitingest_txt(
+# Completed ingests are kept here so interrupted downloads can resume with a Range request
+INGEST_CACHE_DIR = os.getenv("INGEST_CACHE_DIR", os.path.join(tempfile.gettempdir(), "git-galaxy-ingest"))
+INGEST_CACHE_TTL = int(os.getenv("INGEST_CACHE_TTL", "3600"))
+
+# Same default as gitingest.ingest_async
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+CHUNK_SIZE = 64 * 1024
+
+
+def get_download_name(repository_url: str, filename: Optional[str] = None) -> str:
+    """Determine the download filename"""
+    if filename:
+        return filename
+    repo_name = repository_url.rstrip('/').split('/')[-1]
+    return f"gitingest_{repo_name}.txt"
+
+
+async def iter_gitingest(
     repository_url: str,
     token: Optional[str] = None,
-    include_submodules: bool = False,
+    include_patterns: Optional[List[str]] = None,
+    exclude_patterns: Optional[List[str]] = None,
     include_gitignored: bool = False,
-    filename: Optional[str] = None
-) -> Tuple[str, str]:
+    branch: Optional[str] = None
+) -> AsyncIterator[bytes]:
     """
-    Generate a text file from a Git repository using gitingest and return the file path and download name.
+    Stream the same text gitingest writes to its output file, one file at a time.
+
+    Cloning and walking the tree happen before the first chunk, file contents are then read and
+    yielded one by one so the whole dump is never held in memory. Include/exclude patterns are
+    applied while walking. Relies on gitingest 0.1.5 internals (pinned in requirements.txt).
     """
-    # Set token as environment variable if provided
-    if token:
-        os.environ["GITHUB_TOKEN"] = token
-
-    # Create a temporary file for the output
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_file:
-        temp_file_path = temp_file.name
-
-    # Use gitingest to generate the text file
-    # Note: include_submodules and include_gitignored are not supported in this version
-    summary, tree, content = await ingest_async(
-        repository_url,
+    from gitingest.cloning import clone_repo
+    from gitingest.ingestion import _process_node, apply_gitingest_file, ingest_query
+    from gitingest.output_formatters import _create_tree_structure
+    from gitingest.query_parsing import parse_query
+    from gitingest.schemas import FileSystemNode, FileSystemNodeType, FileSystemStats
+    from gitingest.utils.ignore_patterns import load_gitignore_patterns
+
+    query = await parse_query(
+        source=repository_url,
+        max_file_size=MAX_FILE_SIZE,
+        from_web=False,
+        include_patterns=set(include_patterns) if include_patterns else None,
+        ignore_patterns=set(exclude_patterns) if exclude_patterns else None,
         token=token,
-        output=temp_file_path
     )
 
-    # Determine the download filename
-    if filename:
-        download_name = filename
+    try:
+        if query.url:
+            query.branch = branch or query.branch
+            await clone_repo(query.extract_clone_config(), token=token)
+
+        if not include_gitignored:
+            query.ignore_patterns.update(load_gitignore_patterns(query.local_path))
+
+        path = query.local_path / Path(query.subpath.strip("/")).as_posix()
+
+        # Single files are small, let gitingest handle them as usual
+        if query.type == "blob" or query.local_path.is_file():
+            _, tree, content = await asyncio.to_thread(ingest_query, query)
+            yield (tree + "\n" + content).encode("utf-8")
+            return
+
+        apply_gitingest_file(path, query)
+        if not path.exists():
+            raise ValueError(f"{query.slug} cannot be found")
+
+        root_node = FileSystemNode(
+            name=path.name,
+            type=FileSystemNodeType.DIRECTORY,
+            path_str=str(path.relative_to(query.local_path)),
+            path=path,
+        )
+        # Walking only stats files, contents are read below
+        await asyncio.to_thread(_process_node, node=root_node, query=query, stats=FileSystemStats())
+
+        tree = "Directory structure:\n" + _create_tree_structure(query, root_node)
+        yield (tree + "\n").encode("utf-8")
+
+        # Same order and separators as gitingest's _gather_file_contents
+        first = True
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            if node.type == FileSystemNodeType.DIRECTORY:
+                stack.extend(reversed(node.children))
+                continue
+
+            content = await asyncio.to_thread(lambda: node.content_string)
+            yield (content if first else "\n" + content).encode("utf-8")
+            first = False
+    finally:
+        # Only remove this clone, other ingests may be running from the same base directory
+        if query.url:
+            shutil.rmtree(query.local_path.parent, ignore_errors=True)
+
+
+def get_ingest_key(repository_url: str, token: Optional[str], include_patterns: Optional[List[str]],
+                   exclude_patterns: Optional[List[str]], include_gitignored: bool, branch: Optional[str]) -> str:
+    """Key identifying an ingest output, the token is part of it so private repositories are not shared"""
+    parts = [
+        repository_url.rstrip("/"),
+        hashlib.sha256(token.encode("utf-8")).hexdigest() if token else "",
+        ",".join(sorted(include_patterns or [])),
+        ",".join(sorted(exclude_patterns or [])),
+        str(include_gitignored),
+        branch or "",
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class IngestGeneration:
+    """An ingest being written to disk while clients stream it"""
+
+    def __init__(self, key: str, path: str):
+        self.key = key
+        self.path = path
+        self.size = 0
+        self.done = False
+        self.error: Optional[Exception] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_data(self):
+        """Wait until the first chunk is written, the generation fails or finishes"""
+        while not (self.size or self.done or self.error):
+            await self._changed.wait()
+
+    async def tail(self, start: int = 0) -> AsyncIterator[bytes]:
+        """Stream the output from start, following the file as it is written"""
+        await self.wait_for_data()
+        if self.error:
+            raise self.error
+
+        # The handle stays valid when the finished .part file is renamed
+        f = open(self.path, "rb")
+        try:
+            offset = start
+            while True:
+                if offset < self.size:
+                    chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, self.size - offset))
+                    offset += len(chunk)
+                    yield chunk
+                elif self.error:
+                    raise self.error
+                elif self.done:
+                    return
+                else:
+                    await self._changed.wait()
+        finally:
+            f.close()
+
+
+class IngestStore:
+    """Runs ingests in the background, teeing them to disk for concurrent and resumed downloads"""
+
+    def __init__(self, directory: str = INGEST_CACHE_DIR, ttl_seconds: int = INGEST_CACHE_TTL):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._running: Dict[str, IngestGeneration] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def complete_path(self, key: str) -> Optional[str]:
+        """Path of a finished ingest, if one is cached and still fresh"""
+        path = os.path.join(self.directory, f"{key}.txt")
+        try:
+            if time.time() - os.path.getmtime(path) <= self.ttl_seconds:
+                return path
+        except OSError:
+            pass
+        return None
+
+    def get_running(self, key: str) -> Optional[IngestGeneration]:
+        return self._running.get(key)
+
+    def start(self, key: str, chunks: AsyncIterator[bytes]) -> IngestGeneration:
+        """Start writing an ingest to disk, or join the one already running for this key"""
+        if key in self._running:
+            return self._running[key]
+
+        # Created here rather than at import, so it belongs to the user the server runs as
+        os.makedirs(self.directory, exist_ok=True)
+        self.purge_expired()
+        # The pid keeps workers from writing the same .part file
+        generation = IngestGeneration(key, os.path.join(self.directory, f"{key}.{os.getpid()}.part"))
+        self._running[key] = generation
+        # Not tied to any request, so a client disconnecting does not stop the ingest
+        self._tasks[key] = asyncio.create_task(self._write(generation, chunks))
+        return generation
+
+    async def _write(self, generation: IngestGeneration, chunks: AsyncIterator[bytes]):
+        try:
+            with open(generation.path, "wb") as f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+                    await asyncio.to_thread(f.flush)
+                    generation.size += len(chunk)
+                    generation._notify()
+
+            final_path = os.path.join(self.directory, f"{generation.key}.txt")
+            os.replace(generation.path, final_path)
+            generation.path = final_path
+            generation.done = True
+        except Exception as e:
+            print(f"Error while generating ingest {generation.key}: {e}")
+            generation.error = e
+            try:
+                os.remove(generation.path)
+            except OSError:
+                pass
+        finally:
+            generation._notify()
+            del self._running[generation.key]
+            del self._tasks[generation.key]
+
+    def purge_expired(self):
+        """Remove finished ingests older than the TTL and abandoned .part files"""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl_seconds:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=" range into inclusive (start, end), None when unsatisfiable
+
+    Raises ValueError for ranges this server does not support (multiple ranges, other units),
+    which callers should answer with the whole file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError(f"Unsupported range: {header}")
+
+    start_text, _, end_text = spec.strip().partition("-")
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length == 0 or size == 0:
+            return None
+        return max(size - length, 0), size - 1
+
+    start = int(start_text)
+    end = min(int(end_text), size - 1) if end_text else size - 1
+    if start >= size or end < start:
+        return None
+    return start, end
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick zstd (when installed) or gzip from an Accept-Encoding header"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+
+    if "zstd" in accepted:
+        try:
+            import zstandard  # noqa: F401
+            return "zstd"
+        except ImportError:
+            pass
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+async def compress_stream(chunks: AsyncIterator[bytes], encoding: Optional[str]) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly, flushing after each chunk so clients see progress"""
+    if encoding is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    if encoding == "zstd":
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
     else:
-        repo_name = repository_url.rstrip('/').split('/')[-1]
-        download_name = f"gitingest_{repo_name}.txt"
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        flush_mode = zlib.Z_SYNC_FLUSH
+
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(flush_mode)
+        if data:
+            yield data
+    yield compressor.flush()
+
 
-    return temp_file_path, download_name 
\ No newline at end of file
+async def iter_file_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """Stream an inclusive byte range of a file"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
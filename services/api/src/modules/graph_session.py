@@ -0,0 +1,195 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+from .repository_store import RepositoryStore
+from .shared_cache import SharedCache
+
+
+class GraphSession:
+    """Graph built for one search, kept around so it can be expanded incrementally"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.nodes: List[Dict[str, Any]] = []
+        self.links: List[Dict[str, Any]] = []
+        self.repositories = RepositoryStore()
+        self.expanded: set = set()
+        self.last_access = time.monotonic()
+        # (type, lowercased name) -> node id, so the same topic or repo always maps to one node
+        self._node_ids: Dict[Tuple[str, str], int] = {}
+        self._link_keys: set = set()
+
+    def get_node(self, node_id: int) -> Optional[Dict[str, Any]]:
+        """Get a node by its ID"""
+        if 0 <= node_id < len(self.nodes):
+            return self.nodes[node_id]
+        return None
+
+    def add_node(self, name: str, node_type: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Add a node if it is not already in the graph, returning its ID and the node when new"""
+        key = (node_type, name.lower())
+        if key in self._node_ids:
+            return self._node_ids[key], None
+
+        # IDs are never reused, so they stay stable for the whole session
+        node = {"id": len(self.nodes), "name": name, "type": node_type}
+        self._node_ids[key] = node["id"]
+        self.nodes.append(node)
+        return node["id"], node
+
+    def add_link(self, source: int, target: int) -> Optional[Dict[str, Any]]:
+        """Add a link if it is not already in the graph, returning the link when new"""
+        if (source, target) in self._link_keys:
+            return None
+
+        link = {"source": source, "target": target}
+        self._link_keys.add((source, target))
+        self.links.append(link)
+        return link
+
+    def add_repositories(self, repos: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Add repositories and their topics, returning only the nodes, links and repositories that are new"""
+        new_nodes = []
+        new_links = []
+        new_repos = []
+
+        # Topic nodes first, then repo nodes, like the original graph layout
+        topic_ids = {}
+        for repo in repos:
+            for topic in repo['topics']:
+                topic_ids[topic], node = self.add_node(topic, "topic")
+                if node:
+                    new_nodes.append(node)
+
+        for repo in repos:
+            repo_id, node = self.add_node(repo['name'], "repo")
+            if node:
+                new_nodes.append(node)
+                new_repos.append(repo)
+                self.repositories.add(repo)
+            for topic in repo['topics']:
+                link = self.add_link(repo_id, topic_ids[topic])
+                if link:
+                    new_links.append(link)
+
+        return {"nodes": new_nodes, "links": new_links, "repositories": new_repos}
+
+    def size(self) -> Tuple[int, int, int]:
+        """Number of nodes, links and repositories, to get the changes made after this point"""
+        return len(self.nodes), len(self.links), len(self.repositories)
+
+    def changes_since(self, size: Tuple[int, int, int]) -> Dict[str, List[Dict[str, Any]]]:
+        """Nodes, links and repositories added after size() returned the given value
+
+        Everything is append-only, so this includes what concurrent expansions added meanwhile.
+        """
+        node_count, link_count, repo_count = size
+        return {
+            "nodes": self.nodes[node_count:],
+            "links": self.links[link_count:],
+            "repositories": self.repositories.to_dicts(list(range(repo_count, len(self.repositories))))
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state, used to share the session between workers"""
+        return {
+            "nodes": self.nodes,
+            "links": self.links,
+            "repositories": self.repositories.to_columns(),
+            "expanded": list(self.expanded)
+        }
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: Dict[str, Any]) -> "GraphSession":
+        """Rebuild a session from to_dict() output, keeping the same node IDs"""
+        session = cls(session_id)
+        session.nodes = data["nodes"]
+        session.links = data["links"]
+        session.repositories = RepositoryStore.from_columns(data["repositories"])
+        session.expanded = set(data["expanded"])
+        session._node_ids = {(node["type"], node["name"].lower()): node["id"] for node in session.nodes}
+        session._link_keys = {(link["source"], link["target"]) for link in session.links}
+        return session
+
+    def graph(self) -> Dict[str, Any]:
+        """Full graph payload for the client"""
+        return {
+            "session_id": self.session_id,
+            "nodes": self.nodes,
+            "links": self.links
+        }
+
+
+class GraphSessionStore:
+    """LRU store of graph sessions with an idle timeout
+
+    Sessions live in process memory, or in the shared cache when one is given
+    so that any worker can expand a graph created by another.
+    """
+
+    def __init__(self, max_sessions: int = 256, ttl_seconds: int = 3600, cache: Optional[SharedCache] = None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.cache = cache
+        self._sessions: "OrderedDict[str, GraphSession]" = OrderedDict()
+
+    def create(self, repos: List[Dict[str, Any]]) -> GraphSession:
+        """Create a session holding the graph for the given repositories"""
+        self._evict_expired()
+        session = GraphSession(uuid.uuid4().hex)
+        session.add_repositories(repos)
+        if self.cache:
+            self.cache.set("graph_session", session.session_id, session.to_dict(), self.ttl_seconds)
+            return session
+
+        self._sessions[session.session_id] = session
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+        return session
+
+    def get(self, session_id: str) -> Optional[GraphSession]:
+        """Get a session by ID, refreshing its position in the LRU"""
+        if self.cache:
+            data = self.cache.get("graph_session", session_id)
+            return GraphSession.from_dict(session_id, data) if data else None
+
+        self._evict_expired()
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+
+        session.last_access = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def update(self, session_id: str, change: Callable[[GraphSession], Any]) -> Optional[Any]:
+        """Apply a change to the latest version of a session and return its result, None if the session is gone
+
+        With a shared cache the session is read, changed and written back in one transaction, so
+        concurrent expansions in other workers are merged instead of overwritten and IDs stay stable.
+        """
+        if self.cache:
+            def apply(data: Optional[Dict[str, Any]]):
+                if data is None:
+                    return None, None
+                session = GraphSession.from_dict(session_id, data)
+                result = change(session)
+                return session.to_dict(), result
+
+            return self.cache.update("graph_session", session_id, apply, self.ttl_seconds)
+
+        session = self.get(session_id)
+        return change(session) if session is not None else None
+
+    def _evict_expired(self):
+        """Drop sessions that have been idle longer than the TTL"""
+        now = time.monotonic()
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
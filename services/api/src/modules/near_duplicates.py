@@ -0,0 +1,125 @@
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from .readme_processing import MINHASH_PERMUTATIONS, estimate_similarity, minhash_signature, tokenize
+
+# LSH banding: 16 bands of 4 rows puts the candidate threshold around 0.5 Jaccard
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+# Estimated Jaccard similarity of descriptions or READMEs above which two candidates are the same project
+DUPLICATE_THRESHOLD = 0.6
+
+# Just below the threshold, identical topic lists decide; topics alone never make repositories duplicates
+TOPIC_TIEBREAK_MARGIN = 0.1
+
+# Shorter descriptions ("React components") are too generic to tell projects apart
+MIN_DESCRIPTION_TOKENS = 4
+
+
+def description_signature(repo: Dict[str, Any]) -> List[int]:
+    """MinHash signature of a repository's description shingles, empty when it is too short to compare"""
+    tokens = tokenize(repo.get("description") or "")
+    if len(tokens) < MIN_DESCRIPTION_TOKENS:
+        return []
+    return minhash_signature(tokens)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        self.parent[self.find(i)] = self.find(j)
+
+
+def _candidate_pairs(signatures: List[List[int]], clusters: _UnionFind) -> Set[Tuple[int, int]]:
+    """Pairs of repositories sharing an LSH band
+
+    Identical signatures are unioned right away and only one of them is bucketed, so a large
+    group of forks with the same description does not turn into a quadratic number of pairs.
+    """
+    representatives: Dict[Tuple[int, ...], int] = {}
+    for i, signature in enumerate(signatures):
+        if not signature:
+            continue
+        key = tuple(signature)
+        if key in representatives:
+            clusters.union(i, representatives[key])
+        else:
+            representatives[key] = i
+
+    buckets = defaultdict(list)
+    for signature, i in representatives.items():
+        for band in range(LSH_BANDS):
+            start = band * LSH_ROWS
+            buckets[(band, signature[start:start + LSH_ROWS])].append(i)
+
+    pairs = set()
+    for members in buckets.values():
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                pairs.add((i, j))
+    return pairs
+
+
+def _same_topics(repo_a: Dict[str, Any], repo_b: Dict[str, Any]) -> bool:
+    topics_a = {topic.lower() for topic in repo_a.get("topics", [])}
+    return bool(topics_a) and topics_a == {topic.lower() for topic in repo_b.get("topics", [])}
+
+
+def canonical_rank(repo: Dict[str, Any]):
+    """Sort key picking a cluster's canonical repository: original, maintained, most starred"""
+    return (bool(repo.get("fork")), bool(repo.get("archived")), -(repo.get("stars") or 0))
+
+
+def collapse_near_duplicates(repos: List[Dict[str, Any]],
+                             readme_signatures: Optional[Dict[str, List[int]]] = None) -> List[Dict[str, Any]]:
+    """Collapse forks, mirrors and near-identical repositories into one canonical repository per cluster
+
+    Repositories are duplicates when their descriptions or READMEs (signatures by lowercased name)
+    are similar enough; matching topics only settle pairs just below the threshold.
+
+    Keeps the order of the input: each cluster takes the position of its best ranked member.
+    The canonical repository lists the names it stands for under "duplicates".
+    """
+    readme_signatures = readme_signatures or {}
+    descriptions = [description_signature(repo) for repo in repos]
+    readmes = [readme_signatures.get(repo["name"].lower(), []) for repo in repos]
+
+    clusters = _UnionFind(len(repos))
+    for i, j in _candidate_pairs(descriptions, clusters) | _candidate_pairs(readmes, clusters):
+        if clusters.find(i) == clusters.find(j):
+            continue
+        # Descriptions and READMEs are compared separately, whichever is closer counts
+        similarity = max(estimate_similarity(descriptions[i], descriptions[j]),
+                         estimate_similarity(readmes[i], readmes[j]))
+        if similarity >= DUPLICATE_THRESHOLD or \
+                (similarity >= DUPLICATE_THRESHOLD - TOPIC_TIEBREAK_MARGIN and _same_topics(repos[i], repos[j])):
+            clusters.union(i, j)
+
+    members = defaultdict(list)
+    for i in range(len(repos)):
+        members[clusters.find(i)].append(i)
+
+    collapsed = []
+    for i in range(len(repos)):
+        root = clusters.find(i)
+        if root not in members:
+            continue
+        cluster = [repos[j] for j in members.pop(root)]
+        if len(cluster) == 1:
+            collapsed.append(cluster[0])
+            continue
+
+        canonical = min(cluster, key=canonical_rank)
+        canonical["duplicates"] = [repo["name"] for repo in cluster if repo is not canonical]
+        collapsed.append(canonical)
+
+    return collapsed
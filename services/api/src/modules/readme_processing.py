@@ -0,0 +1,201 @@
+import hashlib
+import multiprocessing
+import os
+import random
+import re
+import zlib
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable
+
+from .shared_cache import SharedCache
+
+# Worker processes for README processing, 0 processes READMEs inline
+README_WORKERS = int(os.getenv("README_WORKERS", "2"))
+
+# MinHash parameters, changing them invalidates cached signatures
+MINHASH_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(42)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+# Cache entries live for a week, the key is the content hash so they never go stale
+CACHE_TTL = 7 * 24 * 3600
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having here how if
+in into is it its itself just more most no nor not now of off on once only or other our out over own same
+should so some such than that the their them then there these they this those through to too under until
+up use used using very was we were what when where which while who why will with would you your yours
+""".split())
+
+_CODE_BLOCK = re.compile(r"```.*?```|~~~.*?~~~", re.DOTALL)
+_INLINE_CODE = re.compile(r"`[^`\n]*`")
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_HTML_TAG = re.compile(r"<[^>\n]+>")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)|!\[[^\]]*\]\[[^\]]*\]")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)|\[([^\]]*)\]\[[^\]]*\]")
+_REFERENCE = re.compile(r"^\s*\[[^\]]+\]:\s*\S+.*$", re.MULTILINE)
+_URL = re.compile(r"https?://\S+")
+_MARKUP = re.compile(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+|[*_~|]+|^\s*[-=:| ]{3,}\s*$", re.MULTILINE)
+_WORD = re.compile(r"[a-z][a-z0-9+#.-]*[a-z0-9+#]|[a-z]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def content_hash(content: str) -> str:
+    """Hash of README content, used as the cache key"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def strip_markdown(content: str) -> str:
+    """Reduce markdown to plain prose: drop code, badges, images, HTML and markup"""
+    text = _CODE_BLOCK.sub(" ", content)
+    text = _HTML_COMMENT.sub(" ", text)
+    text = _IMAGE.sub(" ", text)  # badges are images, often wrapped in links
+    text = _LINK.sub(lambda m: m.group(1) or m.group(2) or "", text)
+    text = _HTML_TAG.sub(" ", text)
+    text = _INLINE_CODE.sub(" ", text)
+    text = _REFERENCE.sub(" ", text)
+    text = _URL.sub(" ", text)
+    text = _MARKUP.sub(" ", text)
+    return text
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords"""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def extract_keywords(tokens: List[str], top: int = 10) -> List[str]:
+    """Most frequent meaningful words"""
+    counts = Counter(token for token in tokens if len(token) > 2)
+    return [word for word, _ in counts.most_common(top)]
+
+
+def summarize(text: str, max_chars: int = 300) -> str:
+    """First sentences of the first real paragraph, for snippet display"""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        # Skip leftovers like a lone title or a line of badges
+        if len(paragraph.split()) < 6:
+            continue
+
+        summary = ""
+        for sentence in _SENTENCE_END.split(paragraph):
+            if summary and len(summary) + len(sentence) + 1 > max_chars:
+                break
+            summary = f"{summary} {sentence}".strip()
+        return summary[:max_chars]
+    return ""
+
+
+def minhash_signature(tokens: Iterable[str]) -> List[int]:
+    """MinHash signature over word shingles, comparable with estimate_similarity"""
+    tokens = list(tokens)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return minhash_set(shingles)
+
+
+def minhash_set(items: Iterable[str]) -> List[int]:
+    """MinHash signature of a set of strings, empty for an empty set"""
+    hashes = {zlib.crc32(item.encode("utf-8")) for item in items}
+    if not hashes:
+        return []
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    if not signature_a or not signature_b:
+        return 0.0
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+
+def process_readme(content: str) -> Dict[str, Any]:
+    """Plain text summary, keywords and MinHash signature of a README (runs in worker processes)"""
+    text = strip_markdown(content)
+    tokens = tokenize(text)
+    return {
+        "content_hash": content_hash(content),
+        "summary": summarize(text),
+        "keywords": extract_keywords(tokens),
+        "minhash": minhash_signature(tokens),
+    }
+
+
+class ReadmeProcessor:
+    """Processes READMEs in a process pool, caching results by content hash"""
+
+    def __init__(self, cache: Optional[SharedCache] = None, workers: int = README_WORKERS, local_cache_size: int = 1024):
+        self.cache = cache
+        self.workers = workers
+        self.local_cache_size = local_cache_size
+        self._local_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app does not start processes
+        if self._executor is None:
+            # forkserver workers do not inherit the app's threads, locks and sockets like forked ones would
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("forkserver"))
+        return self._executor
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.cache:
+            return self.cache.get("readme_processed", key)
+        result = self._local_cache.get(key)
+        if result is not None:
+            self._local_cache.move_to_end(key)
+        return result
+
+    def _cache_set(self, key: str, result: Dict[str, Any]):
+        if self.cache:
+            self.cache.set("readme_processed", key, result, CACHE_TTL)
+            return
+        self._local_cache[key] = result
+        while len(self._local_cache) > self.local_cache_size:
+            self._local_cache.popitem(last=False)
+
+    def process_many(self, readmes: List[Optional[str]]) -> List[Optional[Dict[str, Any]]]:
+        """Process READMEs, returning None for missing ones; only uncached content is sent to the pool"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(readmes)
+        pending = {}
+        for i, content in enumerate(readmes):
+            if not content:
+                continue
+            key = content_hash(content)
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if pending:
+            contents = [readmes[indexes[0]] for indexes in pending.values()]
+            if self.workers > 0:
+                processed = list(self.executor.map(process_readme, contents))
+            else:
+                processed = [process_readme(content) for content in contents]
+
+            for indexes, result in zip(pending.values(), processed):
+                self._cache_set(result["content_hash"], result)
+                for i in indexes:
+                    results[i] = result
+
+        return results
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,11 +1,17 @@
 import os
+import time
 import requests
 import base64
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
-import openai
+from requests.adapters import HTTPAdapter
 import json
 
+from .shared_cache import SharedCache
+from .readme_processing import ReadmeProcessor, estimate_similarity, tokenize
+from .near_duplicates import collapse_near_duplicates
+from .repository_store import RepositoryStore
+
 # Load environment variables
 load_dotenv()
 
@@ -16,6 +22,17 @@ HEADERS = {
     "Authorization": f"Bearer {GITHUB_TOKEN}" if GITHUB_TOKEN else None,
 }
 
+# Connection pool size for GitHub API requests
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+
+# How long results are kept in the shared cache, in seconds
+CACHE_TTL = {
+    "llm": 7 * 24 * 3600,
+    "repo_info": 3600,
+    "readme": 24 * 3600,
+    "search": 600,
+}
+
 # OpenAI configuration - use the same variable name as in the original code
 OPENAI_API_KEY = os.getenv("OPENAI_API_TOKEN")  # Changed from OPENAI_API_KEY to OPENAI_API_TOKEN
 
@@ -23,45 +40,107 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_TOKEN")  # Changed from OPENAI_API_KEY to
 class RepositorySearch:
     """Repository search functionality for finding similar repositories on GitHub"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[SharedCache] = None):
         self.github_token = GITHUB_TOKEN
         self.openai_api_key = OPENAI_API_KEY
+        # Shared by all workers when set: LLM results, GitHub metadata and the GitHub rate limit budget
+        self.cache = cache
+        self.readme_processor = ReadmeProcessor(cache=cache)
+        # Shared session so connections to GitHub are kept alive between requests
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.http.mount("https://", adapter)
+
+    def warm_up(self):
+        """Open connections to upstream APIs and load the OpenAI client ahead of the first request"""
+        try:
+            self.http.head("https://api.github.com", headers=HEADERS, timeout=5)
+        except requests.RequestException as e:
+            print(f"Warning: could not reach GitHub API during warm-up: {e}")
+
+        if self.openai_api_key:
+            import openai  # noqa: F401
     
+    def _cache_get(self, namespace: str, *key_parts: Any) -> Optional[Any]:
+        if not self.cache:
+            return None
+        return self.cache.get(namespace, SharedCache.make_key(*key_parts))
+
+    def _cache_set(self, namespace: str, value: Any, *key_parts: Any):
+        if self.cache:
+            self.cache.set(namespace, SharedCache.make_key(*key_parts), value, CACHE_TTL[namespace])
+
+    def github_get(self, url: str) -> Optional[requests.Response]:
+        """GET a GitHub API URL, skipping the call when the shared rate limit budget is exhausted"""
+        # The search API has its own, much smaller, budget
+        resource = "search" if "/search/" in url else "core"
+
+        if self.cache:
+            budget = self.cache.get("github_rate_limit", resource)
+            if budget and budget["remaining"] <= 0:
+                print(f"GitHub {resource} rate limit exhausted, resets in {budget['reset'] - time.time():.0f}s")
+                return None
+
+        response = self.http.get(url, headers=HEADERS)
+
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if self.cache and remaining is not None and reset is not None:
+            # Expires at the reset time, so the budget is forgotten once GitHub refills it
+            ttl = max(int(reset) - time.time(), 1)
+            self.cache.set("github_rate_limit", resource, {"remaining": int(remaining), "reset": int(reset)}, ttl)
+
+        return response
+
     def get_repo_readme(self, full_name: str) -> Optional[str]:
         """Get README content for a repository"""
+        cached = self._cache_get("readme", full_name)
+        if cached is not None:
+            return cached
+
         url = f"https://api.github.com/repos/{full_name}/readme"
-        response = requests.get(url, headers=HEADERS)
+        response = self.github_get(url)
 
-        if response.status_code == 200:
+        if response is not None and response.status_code == 200:
             data = response.json()
             if data.get("encoding") == "base64":
                 content = base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
+                self._cache_set("readme", content, full_name)
                 return content
         return None
 
     def get_repo_info(self, full_name: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a repository"""
+        cached = self._cache_get("repo_info", full_name)
+        if cached is not None:
+            return cached
+
         url = f"https://api.github.com/repos/{full_name}"
-        response = requests.get(url, headers=HEADERS)
+        response = self.github_get(url)
         
-        if response.status_code != 200:
-            print(f"Error while retrieving repo {full_name}: {response.status_code}")
+        if response is None or response.status_code != 200:
+            print(f"Error while retrieving repo {full_name}: {response.status_code if response is not None else 'rate limited'}")
             return None
 
         data = response.json()
-        langs_resp = requests.get(data["languages_url"], headers=HEADERS)
-        languages = list(langs_resp.json().keys()) if langs_resp.status_code == 200 else []
+        langs_resp = self.github_get(data["languages_url"])
+        languages = list(langs_resp.json().keys()) if langs_resp is not None and langs_resp.status_code == 200 else []
 
-        return {
+        info = {
             "name": data["full_name"],
             "description": data["description"] or "",
             "topics": data.get("topics", []),
             "languages": languages,
             "stars": data.get("stargazers_count", 0),
+            "forks": data.get("forks_count", 0),
             "url": data.get("html_url", ""),
             "fork": data.get("fork", False),
             "archived": data.get("archived", False),
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
         }
+        self._cache_set("repo_info", info, full_name)
+        return info
 
     def generate_infos_with_openai(self, user_prompt: str) -> Dict[str, Any]:
         """Extract name keyword and topics from user prompt using OpenAI"""
@@ -69,7 +148,13 @@ class RepositorySearch:
             print("Warning: OPENAI_API_TOKEN not set")
             return {"name_keyword": "", "topics": []}
 
+        cached = self._cache_get("llm", "prompt", user_prompt)
+        if cached is not None:
+            return cached
+
         try:
+            # Imported lazily to keep the API cold start fast
+            import openai
             openai.api_key = self.openai_api_key
             
             prompt = f"""
@@ -126,7 +211,8 @@ class RepositorySearch:
             if not result.get("topics") or len(result["topics"]) == 0:
                 print("Warning: OpenAI returned empty topics")
                 return {"name_keyword": "", "topics": []}
-                
+
+            self._cache_set("llm", result, "prompt", user_prompt)
             return result
             
         except Exception as e:
@@ -143,41 +229,60 @@ class RepositorySearch:
         """Search for repositories based on criteria"""
         query = self.build_query(topics, in_name)
         print(f"Search query: {query}")
-        results = []
+
+        # Cached column by column, search results are the largest entries in the cache
+        cached = self._cache_get("search", query, max_results)
+        if cached is not None:
+            return RepositoryStore.from_columns(cached).to_dicts()
+
+        results = RepositoryStore()
 
         per_page = 100
         total_pages = max_results // per_page + (1 if max_results % per_page > 0 else 0)
 
+        # A search cut short by the rate limit or an error is returned but not cached
+        complete = True
         for page in range(1, total_pages + 1):
             url = (
                 f"https://api.github.com/search/repositories"
                 f"?q={query}&sort=stars&order=desc"
                 f"&per_page={per_page}&page={page}"
             )
-            response = requests.get(url, headers=HEADERS)
-            
+            response = self.github_get(url)
+
+            if response is None:
+                complete = False
+                break
             if response.status_code != 200:
                 print(f"GitHub API Error: {response.status_code} - {response.json()}")
+                complete = False
                 break
 
             items = response.json().get("items", [])
             for repo in items:
-                results.append({
+                results.add({
                     "name": repo["full_name"],
                     "url": repo["html_url"],
                     "description": repo["description"],
                     "stars": repo["stargazers_count"],
+                    "forks": repo.get("forks_count", 0),
                     "topics": repo.get("topics", []),
+                    "fork": repo.get("fork", False),
+                    "archived": repo.get("archived", False),
+                    "created_at": repo.get("created_at"),
+                    "updated_at": repo.get("updated_at"),
                 })
                 
                 if len(results) >= max_results:
-                    return results
+                    break
 
             # Break early if GitHub returns fewer items than requested
-            if len(items) < per_page:
+            if len(items) < per_page or len(results) >= max_results:
                 break
 
-        return results
+        if complete:
+            self._cache_set("search", results.to_columns(), query, max_results)
+        return results.to_dicts()
 
     def sort_by_similar_topics(self, repos: List[Dict[str, Any]], topics: List[str]) -> List[Dict[str, Any]]:
         """Sort repositories by similarity to given topics"""
@@ -190,6 +295,55 @@ class RepositorySearch:
 
         return sorted(repos, key=lambda repo: repo['topics_ratio'], reverse=True)
 
+    def get_cached_readme_infos(self, repos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Processed READMEs by lowercased repository name, for the repositories whose README is already cached"""
+        # Only READMEs already in the shared cache are used, fetching them all would cost one API call per repo
+        if not self.cache:
+            return {}
+        cached = [(repo["name"], self._cache_get("readme", repo["name"])) for repo in repos]
+        cached = [(name, readme) for name, readme in cached if readme]
+        processed = self.readme_processor.process_many([readme for _, readme in cached])
+        return {name.lower(): info for (name, _), info in zip(cached, processed) if info}
+
+    def collapse_near_duplicates(self, repos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep one canonical repository per cluster of forks, mirrors and near-identical repos"""
+        readme_signatures = {name: info["minhash"] for name, info in self.get_cached_readme_infos(repos).items()}
+        collapsed = collapse_near_duplicates(repos, readme_signatures)
+        if len(collapsed) < len(repos):
+            print(f"Collapsed {len(repos) - len(collapsed)} near-duplicate repositories")
+        return collapsed
+
+    def get_topic_repositories(self, topic: str, max_results: int = 100, limit_results: int = 10) -> List[Dict[str, Any]]:
+        """Get the top starred repositories for a single topic, forks and mirrors collapsed"""
+        # Fetch more than needed, collapsing may drop some of the top repositories
+        candidates = self.search_repos("", [topic], max_results)
+        return self.collapse_near_duplicates(candidates)[:limit_results]
+
+    def get_repo_neighbours(self, full_name: str, max_results: int = 100, limit_results: int = 10) -> List[Dict[str, Any]]:
+        """Get a repository with its full topic list and the repositories sharing the most topics with it"""
+        source_repo = self.get_repo_info(full_name)
+        if not source_repo:
+            return []
+        if not source_repo["topics"]:
+            return [source_repo]
+
+        candidates = self.search_repos("", source_repo["topics"], max_results)
+        candidates = [repo for repo in candidates if repo["name"].lower() != source_repo["name"].lower()]
+        candidates = self.sort_by_similar_topics(candidates, source_repo["topics"])
+        candidates = self.collapse_near_duplicates(candidates)
+
+        return [source_repo] + candidates[:limit_results]
+
+    def add_readmes(self, repos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add README content, a plain text summary and keywords to each repository"""
+        readmes = [self.get_repo_readme(repo['name']) for repo in repos]
+        processed = self.readme_processor.process_many(readmes)
+        for repo, readme, info in zip(repos, readmes, processed):
+            repo['readme'] = readme
+            repo['readme_summary'] = info['summary'] if info else None
+            repo['readme_keywords'] = info['keywords'] if info else []
+        return repos
+
     def search_by_prompt(self, user_prompt: str, max_results: int = 500, limit_results: int = 10) -> Dict[str, Any]:
         """Search repositories based on user prompt using AI extraction"""
         try:
@@ -213,13 +367,15 @@ class RepositorySearch:
             
             # Sort by similarity
             repos = self.sort_by_similar_topics(repos, topics)
+
+            # Collapse forks and near-duplicates so every slot is a distinct project
+            repos = self.collapse_near_duplicates(repos)
             
             # Limit results
             repos = repos[:limit_results]
 
-            # Add README content for each repository
-            for repo in repos:
-                repo['readme'] = self.get_repo_readme(repo['name'])
+            # Add README content for each repository, with a plain text summary and keywords
+            self.add_readmes(repos)
 
             return {
                 "user_prompt": user_prompt,
@@ -239,8 +395,14 @@ class RepositorySearch:
                 "repositories": []
             }
 
-    def score_similarity(self, source: Dict[str, Any], candidate: Dict[str, Any]) -> int:
-        """Calculate similarity score between two repositories"""
+    def score_similarity(self, source: Dict[str, Any], candidate: Dict[str, Any],
+                         source_readme: Optional[Dict[str, Any]] = None,
+                         candidate_readme: Optional[Dict[str, Any]] = None) -> float:
+        """Calculate similarity score between two repositories
+
+        The readme arguments are process_readme() results. When both are given the READMEs are compared
+        by MinHash, otherwise the description words (plus the keywords of whichever README is known) are.
+        """
         score = 0
 
         # Common topics
@@ -252,15 +414,19 @@ class RepositorySearch:
         langs_url = candidate.get("languages_url")
         candidate_languages = []
         if langs_url:
-            langs_resp = requests.get(langs_url, headers=HEADERS)
-            if langs_resp.status_code == 200:
+            langs_resp = self.github_get(langs_url)
+            if langs_resp is not None and langs_resp.status_code == 200:
                 candidate_languages = list(langs_resp.json().keys())
         score += len(set(source["languages"]) & set(candidate_languages))
 
-        # Similarity in description
-        source_words = set(source["description"].lower().split())
-        candidate_words = set((candidate.get("description") or "").lower().split())
-        score += len(source_words & candidate_words) // 5  # weak weight
+        # Similarity in README content when both were processed, otherwise in description and README keywords
+        if source_readme and candidate_readme:
+            score += 2 * estimate_similarity(source_readme["minhash"], candidate_readme["minhash"])
+        else:
+            source_words = set(tokenize(source["description"] or "")) | set((source_readme or {}).get("keywords", []))
+            candidate_words = set(tokenize(candidate.get("description") or "")) | set((candidate_readme or {}).get("keywords", []))
+            if source_words and candidate_words:
+                score += 2 * len(source_words & candidate_words) / len(source_words | candidate_words)
 
         return score
 
@@ -269,7 +435,13 @@ class RepositorySearch:
         if not self.openai_api_key:
             return {"name_keyword": "", "topics": []}
 
+        cached = self._cache_get("llm", "description", description)
+        if cached is not None:
+            return cached
+
         try:
+            # Imported lazily to keep the API cold start fast
+            import openai
             openai.api_key = self.openai_api_key
             
             prompt = f"""
@@ -321,7 +493,9 @@ class RepositorySearch:
 
             # Extract arguments provided to the function call
             arguments = response["choices"][0]["message"]["tool_calls"][0]["function"]["arguments"]
-            return json.loads(arguments)
+            result = json.loads(arguments)
+            self._cache_set("llm", result, "description", description)
+            return result
             
         except Exception as e:
             print(f"Error extracting metadata: {e}")
@@ -337,22 +511,28 @@ class RepositorySearch:
                 "repositories": []
             }
 
+        # Keywords and signature of the source README, to compare candidates with
+        source_readme = self.readme_processor.process_many([self.get_repo_readme(repository_name)])[0]
+
         # Build search query
         query = self.build_query(source_repo["topics"], "")
         
         # Search for candidates
         candidates = self.search_repos("", source_repo["topics"], max_results)
 
+        # Candidates are compared by README too when theirs is cached
+        readme_infos = self.get_cached_readme_infos(candidates)
+
         # Calculate similarity scores
         scored = []
         for repo in candidates:
-            score = self.score_similarity(source_repo, repo)
+            score = self.score_similarity(source_repo, repo, source_readme, readme_infos.get(repo["name"].lower()))
             if repo["name"].lower() != source_repo["name"].lower():  # avoid the original
                 scored.append({**repo, "similarity_score": score})
 
         # Sort by similarity score
         scored.sort(key=lambda x: x["similarity_score"], reverse=True)
-        top_matches = scored[:10]
+        top_matches = self.collapse_near_duplicates(scored)[:10]
 
         return {
             "source_repository": source_repo,
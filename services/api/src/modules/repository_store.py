@@ -0,0 +1,250 @@
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+from ..models import Repository, RepositoryType
+
+# Sentinel for missing dates in the epoch columns
+MISSING_DATE = -(2 ** 63)
+
+
+def parse_github_date(value: Optional[str]) -> int:
+    """Convert a GitHub ISO 8601 timestamp to epoch seconds"""
+    if not value:
+        return MISSING_DATE
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return MISSING_DATE
+
+
+def format_github_date(value: int) -> Optional[str]:
+    """Convert epoch seconds back to a GitHub ISO 8601 timestamp"""
+    if value == MISSING_DATE:
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class StringTable:
+    """Interns strings to small integer IDs so repeated topics and languages are stored once"""
+
+    __slots__ = ("_ids", "_values", "_lock")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+        # Tables are shared by stores used from the request threadpool
+        self._lock = threading.Lock()
+
+    def intern(self, value: str) -> int:
+        """Get the ID for a string, adding it to the table if needed"""
+        string_id = self._ids.get(value)
+        if string_id is None:
+            with self._lock:
+                string_id = self._ids.get(value)
+                if string_id is None:
+                    string_id = len(self._values)
+                    self._values.append(value)
+                    self._ids[value] = string_id
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._values[string_id]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Process-wide tables: topic and language vocabularies are small and shared by all stores
+TOPICS = StringTable()
+LANGUAGES = StringTable()
+
+
+def _local_ids(table: StringTable, ids: array) -> Tuple[List[str], List[int]]:
+    """Renumber interned IDs densely, returning the strings used and the renumbered IDs"""
+    local: Dict[int, int] = {}
+    values = []
+    renumbered = []
+    for string_id in ids:
+        if string_id not in local:
+            local[string_id] = len(values)
+            values.append(table[string_id])
+        renumbered.append(local[string_id])
+    return values, renumbered
+
+
+class RepositoryStore:
+    """Columnar in-memory store of repositories
+
+    Numeric fields live in typed arrays, topics and languages are interned in the
+    process-wide tables and stored as flat ID arrays with per-repository offsets.
+    Rows are converted to API dicts or the Repository model only when they leave
+    the store, and whole stores are serialized column by column for the shared cache.
+    """
+
+    def __init__(self, topics: StringTable = TOPICS, languages: StringTable = LANGUAGES):
+        self.topics = topics
+        self.languages = languages
+
+        self._index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.urls: List[str] = []
+        self.descriptions: List[Optional[str]] = []
+
+        self.stars = array("q")
+        self.forks = array("q")
+        self.created_at = array("q")
+        self.updated_at = array("q")
+        # Bit 0: fork, bit 1: archived
+        self.flags = array("B")
+
+        self._topic_ids = array("I")
+        self._topic_offsets = array("I", [0])
+        self._language_ids = array("I")
+        self._language_offsets = array("I", [0])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.names)))
+
+    def find(self, name: str) -> Optional[int]:
+        """Get the row index of a repository by full name"""
+        return self._index.get(name.lower())
+
+    def add(self, repo: Dict[str, Any]) -> int:
+        """Add a repository dict, returning its row index (existing rows are kept as is)"""
+        key = repo["name"].lower()
+        if key in self._index:
+            return self._index[key]
+
+        row = len(self.names)
+        self._index[key] = row
+        self.names.append(repo["name"])
+        self.urls.append(repo.get("url", ""))
+        self.descriptions.append(repo.get("description"))
+
+        self.stars.append(repo.get("stars", 0) or 0)
+        self.forks.append(repo.get("forks", 0) or 0)
+        self.created_at.append(parse_github_date(repo.get("created_at")))
+        self.updated_at.append(parse_github_date(repo.get("updated_at")))
+        self.flags.append((1 if repo.get("fork") else 0) | (2 if repo.get("archived") else 0))
+
+        # GitHub topics are lowercase, lowercasing here keeps lookups from other sources consistent
+        self._topic_ids.extend(self.topics.intern(topic.lower()) for topic in repo.get("topics", []))
+        self._topic_offsets.append(len(self._topic_ids))
+        self._language_ids.extend(self.languages.intern(language) for language in repo.get("languages", []))
+        self._language_offsets.append(len(self._language_ids))
+
+        return row
+
+    def extend(self, repos: List[Dict[str, Any]]) -> List[int]:
+        """Add several repository dicts, returning their row indexes"""
+        return [self.add(repo) for repo in repos]
+
+    def topic_ids(self, row: int) -> array:
+        """Interned topic IDs of a row"""
+        return self._topic_ids[self._topic_offsets[row]:self._topic_offsets[row + 1]]
+
+    def get_topics(self, row: int) -> List[str]:
+        """Topics of a row"""
+        return [self.topics[topic_id] for topic_id in self.topic_ids(row)]
+
+    def get_languages(self, row: int) -> List[str]:
+        """Languages of a row"""
+        start, end = self._language_offsets[row], self._language_offsets[row + 1]
+        return [self.languages[language_id] for language_id in self._language_ids[start:end]]
+
+    def is_fork(self, row: int) -> bool:
+        return bool(self.flags[row] & 1)
+
+    def is_archived(self, row: int) -> bool:
+        return bool(self.flags[row] & 2)
+
+    def to_dict(self, row: int) -> Dict[str, Any]:
+        """Convert a row to the dict shape returned by the API"""
+        return {
+            "name": self.names[row],
+            "url": self.urls[row],
+            "description": self.descriptions[row],
+            "stars": self.stars[row],
+            "forks": self.forks[row],
+            "topics": self.get_topics(row),
+            "languages": self.get_languages(row),
+            "fork": self.is_fork(row),
+            "archived": self.is_archived(row),
+            "created_at": format_github_date(self.created_at[row]),
+            "updated_at": format_github_date(self.updated_at[row]),
+        }
+
+    def to_dicts(self, rows: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Convert rows (all rows by default) to API dicts"""
+        return [self.to_dict(row) for row in (rows if rows is not None else self)]
+
+    def to_repository(self, row: int) -> Repository:
+        """Convert a row to the Repository model"""
+        name = self.names[row]
+        languages = self.get_languages(row)
+        return Repository(
+            id=name,
+            name=name,
+            type=RepositoryType.OTHER,
+            stars=self.stars[row],
+            language=languages[0] if languages else "",
+            owner=name.split("/")[0],
+            url=self.urls[row],
+            description=self.descriptions[row],
+            topics=self.get_topics(row),
+            created_at=format_github_date(self.created_at[row]) or "",
+            last_updated=format_github_date(self.updated_at[row]) or "",
+            forks=self.forks[row],
+        )
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Serializable columns, much smaller than the row dicts since topics and languages are stored once"""
+        topics, topic_ids = _local_ids(self.topics, self._topic_ids)
+        languages, language_ids = _local_ids(self.languages, self._language_ids)
+        return {
+            "names": self.names,
+            "urls": self.urls,
+            "descriptions": self.descriptions,
+            "stars": self.stars.tolist(),
+            "forks": self.forks.tolist(),
+            "created_at": self.created_at.tolist(),
+            "updated_at": self.updated_at.tolist(),
+            "flags": self.flags.tolist(),
+            "topics": topics,
+            "topic_ids": topic_ids,
+            "topic_offsets": self._topic_offsets.tolist(),
+            "languages": languages,
+            "language_ids": language_ids,
+            "language_offsets": self._language_offsets.tolist(),
+        }
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Any]) -> "RepositoryStore":
+        """Rebuild a store from to_columns() output"""
+        store = cls()
+        store.names = data["names"]
+        store.urls = data["urls"]
+        store.descriptions = data["descriptions"]
+        store._index = {name.lower(): row for row, name in enumerate(store.names)}
+
+        store.stars = array("q", data["stars"])
+        store.forks = array("q", data["forks"])
+        store.created_at = array("q", data["created_at"])
+        store.updated_at = array("q", data["updated_at"])
+        store.flags = array("B", data["flags"])
+
+        topic_ids = [store.topics.intern(topic) for topic in data["topics"]]
+        store._topic_ids = array("I", (topic_ids[i] for i in data["topic_ids"]))
+        store._topic_offsets = array("I", data["topic_offsets"])
+        language_ids = [store.languages.intern(language) for language in data["languages"]]
+        store._language_ids = array("I", (language_ids[i] for i in data["language_ids"]))
+        store._language_offsets = array("I", data["language_offsets"])
+        return store
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Callable, Tuple
+
+# SQLite database shared by all workers on the host
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join("/tmp", "git-galaxy-cache.sqlite3"))
+
+# Expired entries are removed when the cache is first opened and then every this many writes
+PURGE_INTERVAL = 1000
+
+
+def connect(path: str, timeout: float = 10) -> sqlite3.Connection:
+    """Open a SQLite connection set up for concurrent use by several processes
+
+    timeout is how long a write waits for another connection's lock before failing.
+    """
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    # WAL lets readers run while one worker writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SharedCache:
+    """Key/value cache with TTLs stored in SQLite, shared by every worker process on the host"""
+
+    def __init__(self, path: str = CACHE_DB_PATH):
+        # Nothing is opened here: the app is imported by tools and build steps that must not create the database
+        self.path = path
+        self._local = threading.local()
+        self._ready = False
+        self._setup_lock = threading.Lock()
+        self._writes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, SQLite connections should not be shared across threads"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path)
+            self._local.conn = conn
+            if not self._ready:
+                self._setup(conn)
+        return conn
+
+    def _setup(self, conn: sqlite3.Connection):
+        """Create the table and drop expired entries, once per process on first use"""
+        with self._setup_lock:
+            if self._ready:
+                return
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._ready = True
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a fixed size key from arbitrary parts (prompts, URLs, ...)"""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired"""
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Warning: shared cache read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: float):
+        """Store a JSON serializable value for ttl_seconds"""
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, default=list), time.time() + ttl_seconds)
+            )
+            # Not exact across threads, it only needs to run every now and then
+            self._writes += 1
+            if self._writes % PURGE_INTERVAL == 0:
+                self.purge_expired()
+        except sqlite3.Error as e:
+            print(f"Warning: shared cache write failed: {e}")
+
+    def update(self, namespace: str, key: str, change: Callable[[Optional[Any]], Tuple[Optional[Any], Any]],
+               ttl_seconds: float) -> Any:
+        """Read, change and write a value in one transaction, so concurrent updates from other workers are not lost
+
+        change gets the current value (None if missing or expired) and returns the new value and a result,
+        which is returned. A new value of None leaves the entry as it is.
+        """
+        conn = self._conn()
+        # IMMEDIATE takes the write lock before reading, other writers wait (up to the connection timeout)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+            value, result = change(json.loads(row[0]) if row else None)
+            if value is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value, default=list), time.time() + ttl_seconds)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def delete(self, namespace: str, key: str):
+        """Remove a cached value"""
+        self._conn().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def purge_expired(self) -> int:
+        """Remove expired entries, returning how many were removed"""
+        return self._conn().execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
@@ -0,0 +1,81 @@
+"""
+Import-time profiling for the API cold start.
+
+Run from services/api to print a report and fail when the budget is exceeded:
+
+    python -m src.modules.startup
+
+test_startup.py runs the same check with the test suite.
+"""
+import os
+import subprocess
+import sys
+from typing import Dict, Any
+
+# Budget for importing the app in a fresh interpreter
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+# Modules that must never be loaded while importing the app
+HEAVY_MODULES = ("torch", "transformers", "numpy", "openai", "gitingest", "tiktoken")
+
+
+def profile_import(module_name: str = "src.main", top: int = 15) -> Dict[str, Any]:
+    """Import a module in a fresh interpreter with -X importtime and summarise the result"""
+    code = (
+        f"import sys, {module_name}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+
+    # Lines look like: "import time:   self [us] |  cumulative | imported package"
+    timings = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    total = next((t["cumulative_ms"] for t in timings if t["module"] == module_name), 0.0)
+    heavy = [name for name in proc.stdout.strip().split(",") if name]
+
+    return {
+        "module": module_name,
+        "total_ms": total,
+        "budget_ms": IMPORT_BUDGET_MS,
+        "within_budget": total <= IMPORT_BUDGET_MS and not heavy,
+        "heavy_modules": heavy,
+        "slowest": sorted(timings, key=lambda t: t["self_ms"], reverse=True)[:top],
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print an import profiling report"""
+    if "error" in report:
+        print(f"❌ Could not import app: {report['error']}")
+        return
+
+    status = "✅" if report["within_budget"] else "❌"
+    print(f"{status} {report['module']} imported in {report['total_ms']:.0f} ms (budget {report['budget_ms']:.0f} ms)")
+    if report["heavy_modules"]:
+        print(f"   Heavy modules loaded at import time: {', '.join(report['heavy_modules'])}")
+
+    print("   Slowest modules (self time):")
+    for timing in report["slowest"]:
+        print(f"   {timing['self_ms']:8.1f} ms  {timing['cumulative_ms']:8.1f} ms cumulative  {timing['module']}")
+
+
+if __name__ == "__main__":
+    report = profile_import(sys.argv[1] if len(sys.argv) > 1 else "src.main")
+    print_report(report)
+    sys.exit(0 if report.get("within_budget") else 1)
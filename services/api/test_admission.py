@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for rate limiting and load shedding
+"""
+import asyncio
+import time
+
+import httpx
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.modules import admission
+from src.modules.admission import LoadSheddingMiddleware, SQLiteStorage
+from src.modules.shared_cache import connect
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_storages(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'limits.sqlite3'}"
+    return storage_from_string(uri), storage_from_string(uri)
+
+
+def test_storage_is_registered_for_sqlite_uris(tmp_path):
+    first, _ = make_storages(tmp_path)
+    assert isinstance(first, SQLiteStorage)
+    assert first.check()
+
+
+def test_counts_are_shared_between_storages(tmp_path):
+    first, second = make_storages(tmp_path)
+
+    assert first.incr("client", 60) == 1
+    assert second.incr("client", 60) == 2
+    assert first.incr("client", 60, amount=3) == 5
+    assert second.get("client") == 5
+    assert first.get("other") == 0
+
+    second.clear("client")
+    assert first.get("client") == 0
+
+
+def test_window_expiry(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "time", clock)
+    first, second = make_storages(tmp_path)
+
+    first.incr("client", 60)
+    second.incr("client", 60)
+    assert first.get_expiry("client") == clock.now + 60
+
+    # A new window starts once the previous one expired
+    clock.now += 61
+    assert second.get("client") == 0
+    assert first.incr("client", 60) == 1
+    assert second.get_expiry("client") == clock.now + 60
+
+
+def test_limiter_across_storages(tmp_path):
+    first, second = make_storages(tmp_path)
+    limit = parse("2/minute")
+
+    assert FixedWindowRateLimiter(first).hit(limit, "client")
+    assert FixedWindowRateLimiter(second).hit(limit, "client")
+    assert not FixedWindowRateLimiter(first).hit(limit, "client")
+    assert FixedWindowRateLimiter(second).hit(limit, "other client")
+
+
+def test_expired_windows_are_purged(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "time", clock)
+    monkeypatch.setattr(admission, "PURGE_INTERVAL", 3)
+    storage, _ = make_storages(tmp_path)
+
+    storage.incr("gone", 10)
+    clock.now += 11
+    storage.incr("client", 60)
+    assert storage.conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0] == 2
+
+    storage.incr("client", 60)
+    assert storage.conn.execute("SELECT key FROM rate_limits").fetchall() == [("client",)]
+
+
+def test_load_shedding():
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return PlainTextResponse("done")
+
+    async def health(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/slow", slow), Route("/health", health)])
+    shedding = LoadSheddingMiddleware(app, max_in_flight=2)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=shedding), base_url="http://test") as client:
+            pending = [asyncio.create_task(client.get("/slow")) for _ in range(2)]
+            while shedding.in_flight < 2:
+                await asyncio.sleep(0.01)
+
+            shed = await client.get("/slow")
+            exempt = await client.get("/health")
+
+            release.set()
+            completed = await asyncio.gather(*pending)
+            after = await client.get("/slow")
+            return shed, exempt, completed, after
+
+    shed, exempt, completed, after = asyncio.run(run())
+
+    assert shed.status_code == 429
+    assert shed.headers["Retry-After"] == "1"
+    assert exempt.status_code == 200
+    assert [response.status_code for response in completed] == [200, 200]
+    assert after.status_code == 200
+    assert shedding.in_flight == 0
+
+
+def test_busy_database_does_not_block(tmp_path):
+    storage, _ = make_storages(tmp_path)
+    storage.incr("client", 60)
+
+    # Another worker holding the write lock
+    other = connect(storage.path)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        assert storage.incr("client", 60) == 0
+        assert time.monotonic() - started < 1
+        assert storage.get("client") == 1
+    finally:
+        other.execute("ROLLBACK")
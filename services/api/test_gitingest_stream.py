@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for gitingest download ranges and compression
+"""
+import asyncio
+import gzip
+import zlib
+from unittest import mock
+
+import pytest
+
+from src.modules.gitingest import IngestStore, compress_stream, negotiate_encoding, parse_range
+
+
+def test_parse_range_closed_and_open_ended():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=500-", 1000) == (500, 999)
+    # The end is clamped to the file
+    assert parse_range("bytes=900-5000", 1000) == (900, 999)
+
+
+def test_parse_range_suffix():
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    # Longer than the file: the whole file
+    assert parse_range("bytes=-5000", 1000) == (0, 999)
+
+
+def test_parse_range_unsatisfiable():
+    # Answered with 416
+    assert parse_range("bytes=1000-", 1000) is None
+    assert parse_range("bytes=500-400", 1000) is None
+    assert parse_range("bytes=-0", 1000) is None
+    assert parse_range("bytes=-10", 0) is None
+
+
+def test_parse_range_unsupported():
+    # Answered with the whole file
+    with pytest.raises(ValueError):
+        parse_range("bytes=0-10,20-30", 1000)
+    with pytest.raises(ValueError):
+        parse_range("items=0-10", 1000)
+    with pytest.raises(ValueError):
+        parse_range("bytes=abc-", 1000)
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br, zstd") == "zstd"
+    assert negotiate_encoding("gzip;q=1.0, zstd;q=0") == "gzip"
+    assert negotiate_encoding("GZIP") == "gzip"
+    assert negotiate_encoding("deflate, br") is None
+    assert negotiate_encoding("") is None
+
+
+def test_negotiate_encoding_without_zstandard():
+    with mock.patch.dict("sys.modules", {"zstandard": None}):
+        assert negotiate_encoding("zstd, gzip") == "gzip"
+        assert negotiate_encoding("zstd") is None
+
+
+def collect(chunks, encoding):
+    async def chunk_iter():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [data async for data in compress_stream(chunk_iter(), encoding)]
+
+    return asyncio.run(run())
+
+
+def test_compress_stream_gzip_round_trip():
+    chunks = [b"first file\n" * 100, b"second file\n" * 100]
+    compressed = collect(chunks, "gzip")
+
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
+    # Flushed after each chunk, so clients get data before the stream ends
+    assert zlib.decompressobj(31).decompress(compressed[0]) == chunks[0]
+
+
+def test_compress_stream_zstd_round_trip():
+    zstandard = pytest.importorskip("zstandard")
+    chunks = [b"first file\n" * 100, b"second file\n" * 100]
+    compressed = b"".join(collect(chunks, "zstd"))
+
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(compressed) == b"".join(chunks)
+
+
+def test_compress_stream_identity():
+    assert collect([b"a", b"b"], None) == [b"a", b"b"]
+
+
+def test_ingest_store_creates_its_directory_on_first_ingest(tmp_path):
+    directory = tmp_path / "ingest"
+    store = IngestStore(str(directory))
+    assert not directory.exists()
+    assert store.complete_path("key") is None
+
+    async def chunks():
+        yield b"tree\n"
+        yield b"files"
+
+    async def run():
+        generation = store.start("key", chunks())
+        return b"".join([chunk async for chunk in generation.tail()])
+
+    assert asyncio.run(run()) == b"tree\nfiles"
+    with open(store.complete_path("key"), "rb") as f:
+        assert f.read() == b"tree\nfiles"
+
+
+def test_download_ranges(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.main import app, ingest_store
+    from src.modules.gitingest import get_ingest_key
+
+    monkeypatch.setattr(ingest_store, "directory", str(tmp_path))
+    url = "https://github.com/owner/repo"
+    key = get_ingest_key(url, None, None, None, False, None)
+    content = b"0123456789" * 100
+    (tmp_path / f"{key}.txt").write_bytes(content)
+
+    client = TestClient(app)
+
+    def download(**headers):
+        return client.get("/gitingest/download", params={"repository_url": url}, headers=headers)
+
+    partial = download(Range="bytes=-10", **{"Accept-Encoding": "gzip"})
+    assert partial.status_code == 206
+    assert partial.headers["Content-Range"] == "bytes 990-999/1000"
+    assert "Content-Encoding" not in partial.headers
+    assert partial.content == content[-10:]
+
+    assert download(Range="bytes=1000-").status_code == 416
+
+    # Malformed and multiple ranges are ignored: a full response, compressed when accepted
+    for header in ("bytes=abc", "bytes=0-1,5-6"):
+        full = download(Range=header, **{"Accept-Encoding": "gzip"})
+        assert full.status_code == 200
+        assert "Content-Range" not in full.headers
+        assert full.headers["Content-Encoding"] == "gzip"
+        assert full.headers["ETag"] == f'"{key}-gzip"'
+        assert full.content == content
+
+    # A stale If-Range gets the whole file
+    stale = download(Range="bytes=0-9", **{"If-Range": '"other"', "Accept-Encoding": "identity"})
+    assert stale.status_code == 200
+    assert stale.headers["Content-Length"] == "1000"
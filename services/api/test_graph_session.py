@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental graph sessions
+"""
+from src.modules.graph_session import GraphSession, GraphSessionStore
+from src.modules.shared_cache import SharedCache
+
+
+def make_repo(name, topics):
+    return {
+        "name": name,
+        "url": f"https://github.com/{name}",
+        "description": f"{name} description",
+        "stars": 10,
+        "forks": 1,
+        "topics": topics,
+        "created_at": "2020-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def test_first_batch_is_the_whole_graph():
+    session = GraphSession("test")
+    delta = session.add_repositories([make_repo("a/one", ["python", "cli"]), make_repo("b/two", ["python"])])
+
+    assert [node["name"] for node in delta["nodes"]] == ["python", "cli", "a/one", "b/two"]
+    assert [node["id"] for node in delta["nodes"]] == [0, 1, 2, 3]
+    assert delta["links"] == [{"source": 2, "target": 0}, {"source": 2, "target": 1}, {"source": 3, "target": 0}]
+    assert [repo["name"] for repo in delta["repositories"]] == ["a/one", "b/two"]
+    assert session.graph()["nodes"] == delta["nodes"]
+
+
+def test_delta_only_contains_new_items():
+    session = GraphSession("test")
+    session.add_repositories([make_repo("a/one", ["python", "cli"])])
+
+    delta = session.add_repositories([make_repo("A/One", ["python", "cli"]), make_repo("c/three", ["Python", "web"])])
+
+    # Names are matched case-insensitively, existing nodes and links are not repeated
+    assert [(node["id"], node["name"]) for node in delta["nodes"]] == [(3, "web"), (4, "c/three")]
+    assert delta["links"] == [{"source": 4, "target": 0}, {"source": 4, "target": 3}]
+    assert [repo["name"] for repo in delta["repositories"]] == ["c/three"]
+
+
+def test_ids_are_stable_across_expansions_and_serialization():
+    session = GraphSession("test")
+    session.add_repositories([make_repo("a/one", ["python"])])
+    ids = {node["name"]: node["id"] for node in session.nodes}
+
+    restored = GraphSession.from_dict("test", session.to_dict())
+    delta = restored.add_repositories([make_repo("a/one", ["python", "rust"]), make_repo("d/four", ["rust"])])
+
+    assert {node["name"]: node["id"] for node in restored.nodes if node["name"] in ids} == ids
+    assert [(node["id"], node["name"]) for node in delta["nodes"]] == [(2, "rust"), (3, "d/four")]
+    # The new topic of an existing repository only adds a link
+    assert delta["links"] == [{"source": 1, "target": 2}, {"source": 3, "target": 2}]
+    assert restored.get_node(1)["name"] == "a/one"
+    assert restored.get_node(4) is None
+
+
+def test_repeated_batch_adds_nothing():
+    session = GraphSession("test")
+    repos = [make_repo("a/one", ["python"]), make_repo("b/two", ["go"])]
+    session.add_repositories(repos)
+
+    assert session.add_repositories(repos) == {"nodes": [], "links": [], "repositories": []}
+
+
+def test_concurrent_expansions_are_merged(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"))
+    store = GraphSessionStore(cache=cache)
+    session_id = store.create([make_repo("a/one", ["python"])]).session_id
+
+    # Both requests start from the same version of the session
+    first = store.get(session_id)
+    second = store.get(session_id)
+    first_since, second_since = first.size(), second.size()
+
+    def expand(repos, since):
+        def merge(latest):
+            latest.add_repositories(repos)
+            return latest.changes_since(since)
+        return store.update(session_id, merge)
+
+    first_delta = expand([make_repo("b/two", ["go"])], first_since)
+    second_delta = expand([make_repo("c/three", ["go"])], second_since)
+
+    assert [(node["id"], node["name"]) for node in first_delta["nodes"]] == [(2, "go"), (3, "b/two")]
+    # The second request also gets what the first added, so its links resolve on the client
+    assert [(node["id"], node["name"]) for node in second_delta["nodes"]] == [(2, "go"), (3, "b/two"), (4, "c/three")]
+    assert [repo["name"] for repo in second_delta["repositories"]] == ["b/two", "c/three"]
+
+    latest = store.get(session_id)
+    assert [node["name"] for node in latest.nodes] == ["python", "a/one", "go", "b/two", "c/three"]
+    assert store.update("missing", lambda session: session.size()) is None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate repository collapsing
+"""
+from src.modules.near_duplicates import collapse_near_duplicates
+from src.modules.readme_processing import minhash_signature, tokenize
+
+
+def make_repo(name, description, topics=(), stars=0, fork=False, archived=False):
+    return {
+        "name": name,
+        "description": description,
+        "topics": list(topics),
+        "stars": stars,
+        "fork": fork,
+        "archived": archived,
+    }
+
+
+def names(repos):
+    return [repo["name"] for repo in repos]
+
+
+def test_forks_and_mirrors_collapse_into_the_original():
+    description = "State-of-the-art machine learning for PyTorch, TensorFlow and JAX"
+    repos = [
+        make_repo("someone/transformers", description, ["nlp"], stars=3, fork=True),
+        make_repo("huggingface/transformers", description, ["nlp"], stars=120000),
+        make_repo("pytorch/vision", "Datasets, transforms and models specific to computer vision", ["pytorch"]),
+        make_repo("mirror/transformers", description + ".", ["nlp"], stars=50),
+    ]
+
+    collapsed = collapse_near_duplicates(repos)
+
+    # The canonical repository takes the place of the first member of its cluster
+    assert names(collapsed) == ["huggingface/transformers", "pytorch/vision"]
+    assert collapsed[0]["duplicates"] == ["someone/transformers", "mirror/transformers"]
+    assert "duplicates" not in collapsed[1]
+
+
+def test_same_topics_without_description_are_not_duplicates():
+    topics = ["deep-learning", "pytorch", "python", "machine-learning", "neural-network"]
+    repos = [
+        make_repo("huggingface/transformers", None, topics, stars=120000),
+        make_repo("pytorch/vision", None, topics, stars=15000),
+    ]
+
+    assert names(collapse_near_duplicates(repos)) == ["huggingface/transformers", "pytorch/vision"]
+
+
+def test_same_topics_with_different_short_descriptions_are_not_duplicates():
+    topics = ["react", "javascript", "typescript", "ui", "frontend", "library", "components"]
+    repos = [
+        make_repo("a/button-kit", "React components", topics),
+        make_repo("b/form-kit", "React hooks", topics),
+    ]
+
+    assert names(collapse_near_duplicates(repos)) == ["a/button-kit", "b/form-kit"]
+
+
+def test_similar_readmes_collapse_without_descriptions():
+    readme = tokenize("a fast terminal user interface library that draws widgets and handles keyboard input " * 3)
+    repos = [
+        make_repo("original/tui", None, stars=900),
+        make_repo("copy/tui-fork", "", stars=2, fork=True),
+        make_repo("other/tui", None, stars=10),
+    ]
+    signatures = {
+        "original/tui": minhash_signature(readme),
+        "copy/tui-fork": minhash_signature(readme + ["extra", "words"]),
+        "other/tui": minhash_signature(tokenize("a web server written in rust with async handlers and routing")),
+    }
+
+    collapsed = collapse_near_duplicates(repos, signatures)
+
+    assert names(collapsed) == ["original/tui", "other/tui"]
+    assert collapsed[0]["duplicates"] == ["copy/tui-fork"]
+
+
+def test_clusters_are_found_across_whole_buckets():
+    # Many identical forks and one mirror whose description differs slightly
+    description = "Curated collection of tools and libraries for building command line applications in Go"
+    repos = [make_repo(f"fork{i}/cli-tools", description, fork=True) for i in range(30)]
+    repos.append(make_repo("go/cli-tools", description, stars=5000))
+    repos.append(make_repo("mirror/cli-tools", description + " quickly", archived=True))
+
+    collapsed = collapse_near_duplicates(repos)
+
+    assert names(collapsed) == ["go/cli-tools"]
+    assert len(collapsed[0]["duplicates"]) == 31
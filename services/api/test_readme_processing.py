@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for README processing
+"""
+from src.modules.readme_processing import (
+    ReadmeProcessor, estimate_similarity, minhash_signature, process_readme, strip_markdown, summarize, tokenize
+)
+
+
+README = """# fastwidget
+
+[![Build](https://img.shields.io/badge/build-passing-green.svg)](https://ci.example.com)
+![logo](docs/logo.png)
+
+<!-- internal note -->
+<p align="center"><b>Widgets</b></p>
+
+**fastwidget** renders [interactive widgets](https://example.com/docs) in the terminal. It is *fast* and has no dependencies!
+
+```bash
+pip install fastwidget
+```
+
+Call `render()` to draw a widget.
+
+[docs]: https://example.com/docs
+"""
+
+
+def test_strip_markdown_keeps_prose_only():
+    text = strip_markdown(README)
+
+    assert "renders interactive widgets in the terminal" in text
+    assert "fastwidget" in text and "Widgets" in text
+    for removed in ("img.shields.io", "logo.png", "internal note", "pip install", "render()", "https://", "**", "<p"):
+        assert removed not in text
+
+
+def test_summarize_skips_titles_and_badges():
+    text = strip_markdown(README)
+    assert summarize(text) == "fastwidget renders interactive widgets in the terminal. It is fast and has no dependencies!"
+
+
+def test_summarize_stops_at_sentence_boundary():
+    text = "One two three four five six. " * 20
+    summary = summarize(text, max_chars=80)
+
+    assert summary == "One two three four five six. One two three four five six."
+    assert summarize("Too short\n\nalso short") == ""
+
+
+def test_minhash_similarity():
+    tokens = tokenize("a command line tool that renders interactive widgets in the terminal without dependencies")
+    same = minhash_signature(tokens)
+
+    assert estimate_similarity(same, minhash_signature(tokens)) == 1.0
+    assert estimate_similarity(same, minhash_signature(tokenize("a web framework for building async http services"))) < 0.2
+    assert minhash_signature([]) == [] and estimate_similarity(same, []) == 0.0
+
+
+def test_process_many_caches_by_content():
+    processor = ReadmeProcessor(workers=0)
+    first, missing, second = processor.process_many([README, None, README])
+
+    assert first == process_readme(README)
+    assert missing is None
+    assert second is first
+    assert processor.process_many([README])[0] is first
+
+
+def test_workers_do_not_import_the_app():
+    processor = ReadmeProcessor(workers=1)
+    try:
+        assert processor.process_many([README])[0] == process_readme(README)
+        # Evaluated in the worker process
+        loaded = processor.executor.submit(eval, "[name for name in ('src.main', 'fastapi') if name in __import__('sys').modules]")
+        assert loaded.result(timeout=60) == []
+    finally:
+        processor.shutdown()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar repository store
+"""
+import json
+
+from src.models import Repository
+from src.modules.repository_store import RepositoryStore
+
+
+REPOS = [
+    {
+        "name": "a/one",
+        "url": "https://github.com/a/one",
+        "description": "First",
+        "stars": 12,
+        "forks": 3,
+        "topics": ["Python", "cli"],
+        "languages": ["Python"],
+        "fork": False,
+        "archived": True,
+        "created_at": "2020-01-02T03:04:05Z",
+        "updated_at": None,
+    },
+    {
+        "name": "b/two",
+        "url": "https://github.com/b/two",
+        "description": None,
+        "stars": 0,
+        "forks": 0,
+        "topics": ["cli"],
+        "languages": [],
+        "fork": True,
+        "archived": False,
+        "created_at": "2021-06-07T08:09:10Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    },
+]
+
+
+def test_topics_are_lowercased():
+    store = RepositoryStore()
+    store.extend(REPOS)
+
+    assert store.get_topics(store.find("A/One")) == ["python", "cli"]
+    assert store.topic_ids(0)[1] == store.topic_ids(1)[0]
+
+
+def test_columns_round_trip_through_json():
+    store = RepositoryStore()
+    store.extend(REPOS)
+
+    columns = json.loads(json.dumps(store.to_columns()))
+    assert columns["topics"] == ["python", "cli"]
+
+    restored = RepositoryStore.from_columns(columns)
+    assert restored.to_dicts() == store.to_dicts()
+    assert restored.to_dict(0)["created_at"] == "2020-01-02T03:04:05Z"
+    assert restored.is_archived(0) and restored.is_fork(1)
+    assert "b/two" in restored
+
+
+def test_to_repository():
+    store = RepositoryStore()
+    store.extend(REPOS)
+
+    repo = store.to_repository(0)
+    assert isinstance(repo, Repository)
+    assert (repo.id, repo.owner, repo.language, repo.stars, repo.forks) == ("a/one", "a", "Python", 12, 3)
+    assert repo.topics == ["python", "cli"]
+    assert (repo.created_at, repo.last_updated) == ("2020-01-02T03:04:05Z", "")
+
+    other = store.to_repository(store.find("b/two"))
+    assert other.language == "" and other.description is None
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Tests for the API cold start
+"""
+from src.modules.startup import profile_import
+
+
+def test_app_import_is_light_and_within_budget(tmp_path, monkeypatch):
+    # Keep the profiled import away from the real cache locations
+    monkeypatch.setenv("CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("INGEST_CACHE_DIR", str(tmp_path / "ingest"))
+
+    report = profile_import()
+
+    assert "error" not in report, report.get("error")
+    assert report["heavy_modules"] == []
+    assert report["total_ms"] <= report["budget_ms"], f"src.main imported in {report['total_ms']:.0f} ms"
+    assert report["within_budget"]